@@ -1,28 +1,150 @@
 #!/usr/bin/env python3
 import urllib.request
+import urllib.error
 import urllib.parse
-import base64
 import json
 import logging
-import copy
+import hashlib
 import argparse
 import re
 import sys
 import os
 import traceback
+import concurrent.futures
+import itertools
+
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+    # Reused by every jsonLoads() call, so its internal buffers are only
+    # allocated once. Not thread-safe.
+    simdjsonParser = simdjson.Parser()
+except ImportError:
+    simdjson = None
+    simdjsonParser = None
+
+try:
+    import requests
+    import requests.adapters
+    # Shared by every fetchUrl() call, so connections (and TLS sessions) to
+    # the same host are kept alive and reused.
+    httpSession = requests.Session()
+    httpAdapter = requests.adapters.HTTPAdapter(pool_connections=4,
+                                                pool_maxsize=16)
+    httpSession.mount("http://", httpAdapter)
+    httpSession.mount("https://", httpAdapter)
+except ImportError:
+    requests = None
+    httpSession = None
 
 logger = logging.getLogger(__name__)
 
+# Name of the cache file in the output directory. It records the state of
+# the generated config files (see writeJsonFile()) and the last response of
+# each subscription link (see fetchV2rayNSubscrs()).
+cacheFileName = ".v2ray-subscr-cache.json"
+
+# Precompiled regular expressions.
+fileNameRe    = re.compile(r"[-/|\s]+")
+vlessNetlocRe = re.compile(r"^([-\da-f]+)@([^:]+):(\d+)$")
+
+
+def jsonLoads(data):
+    """
+    Parse a JSON document, using simdjson or orjson if available.
+    @data: <bytes> or <string>
+    @return: <dict>
+    """
+    if simdjsonParser:
+        # The parser can only be reused once the proxies of the previous
+        # document are gone, so always convert to plain python objects.
+        doc = simdjsonParser.parse(data)
+        if isinstance(doc, simdjson.Object):
+            return doc.as_dict()
+        if isinstance(doc, simdjson.Array):
+            return doc.as_list()
+        return doc
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def jsonDumps(obj):
+    """
+    Serialize an object into indented JSON, using orjson if available. Both
+    paths produce the same bytes.
+    @obj: <dict>
+    @return: <bytes>
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def fetchUrl(url, userAgent, etag="", lastModified=""):
+    """
+    Get the content of a url, using requests if available.
+    @userAgent: if not empty, override the default user agent.
+    @etag, @lastModified: if not empty, send a conditional request with
+        If-None-Match / If-Modified-Since.
+    @return: (content<bytes>, etag<string>, lastModified<string>).
+        content is None if the server replies 304 Not Modified.
+    """
+    headers = {}
+    if userAgent:
+        headers["User-Agent"] = userAgent
+    if etag:
+        headers["If-None-Match"] = etag
+    if lastModified:
+        headers["If-Modified-Since"] = lastModified
+
+    if httpSession:
+        response = httpSession.get(url, headers=headers, timeout=20)
+        if response.status_code == 304:
+            return None, etag, lastModified
+        response.raise_for_status()
+        return (response.content, response.headers.get("ETag", ""),
+                response.headers.get("Last-Modified", ""))
+
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=20) as response:
+            return (response.read(), response.headers.get("ETag", ""),
+                    response.headers.get("Last-Modified", ""))
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag, lastModified
+        raise
+
 
 def strToFileName(s):
     """
     Remove the special characters for a file name.
     @return: <string>
     """
-    s = re.sub(r"[-/|\s]+", "-", s)
+    s = fileNameRe.sub("-", s)
     return s
 
 
+def isCfgFileName(fileName):
+    """
+    Check whether a file name looks like a generated config file, i.e.
+    "<3 digits>-<desc>.json".
+    @return: <bool>
+    """
+    return (len(fileName) > 8 and fileName[:3].isdigit() and
+            fileName[3] == "-" and fileName.endswith(".json"))
+
+
 def parseVmessSubscr(urlParseRes):
     """
     Parse a VMESS subscription url.
@@ -33,12 +155,13 @@ def parseVmessSubscr(urlParseRes):
     assert urlParseRes.scheme == "vmess"
     encNodeConfigText = urlParseRes.netloc
     encNodeConfigBytes = encNodeConfigText.encode("ascii")
-    decNodeConfigBytes = base64.b64decode(encNodeConfigBytes)
-    decNodeConfigText = decNodeConfigBytes.decode("utf-8")
-    logger.debug("VMESS node config text: %s", decNodeConfigText)
-    nodeConfig = json.loads(decNodeConfigText)
+    decNodeConfigBytes = b64decode(encNodeConfigBytes)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("VMESS node config text: %s",
+                     decNodeConfigBytes.decode("utf-8", "replace"))
+    nodeConfig = jsonLoads(decNodeConfigBytes)
 
-    logger.debug("VMESS node config: %s", repr(nodeConfig))
+    logger.debug("VMESS node config: %r", nodeConfig)
     return nodeConfig
 
 
@@ -53,7 +176,7 @@ def parseVlessSubscr(urlParseRes):
     assert urlParseRes.scheme == "vless" or urlParseRes.scheme == "trojan"
     nodeConfig = {}
 
-    m = re.match(r"^([-\da-f]+)@([^:]+):(\d+)$", urlParseRes.netloc)
+    m = vlessNetlocRe.match(urlParseRes.netloc)
     if m is None:
         logger.warning("Netloc format error: '%s', expecting 'uuid@host:port'",
                        urlParseRes.netloc)
@@ -63,79 +186,111 @@ def parseVlessSubscr(urlParseRes):
     nodeConfig["n_host"] = m[2]
     nodeConfig["n_port"] = int(m[3])
 
-    # In a query string, a key may have multiple values. So the format of
-    # qsParseRes is: {key1: [vals1], key2: [vals2], ...}
-    qsParseRes = urllib.parse.parse_qs(urlParseRes.query, keep_blank_values=True)
-    for qk, qv in qsParseRes.items():
+    # In a query string, a key may have multiple values. Only the first one
+    # is used.
+    qsParseRes = urllib.parse.parse_qsl(urlParseRes.query,
+                                        keep_blank_values=True)
+    for qk, qv in qsParseRes:
         k = "q_" + qk
-        v = qv[0]
-        assert len(qv) >= 1
-        if len(qv) > 1:
-            logger.warning("Query string key '%s' has multiple values: %s",
-                           qk, str(qv))
-        nodeConfig[k] = v
+        if k in nodeConfig:
+            logger.warning("Query string key '%s' has multiple values, "
+                           "ignoring: %s", qk, qv)
+            continue
+        nodeConfig[k] = qv
 
     # Add some default values.
     nodeConfig.setdefault("q_type", "tcp")
     nodeConfig.setdefault("q_security", "none")
     nodeConfig.setdefault("q_flow", "none")
 
-    logger.debug("VLESS node config: %s", repr(nodeConfig))
+    logger.debug("VLESS node config: %r", nodeConfig)
     return nodeConfig
 
 
-def parseV2rayNSubscr(url, userAgent):
+# Subscription url parser for each nodeType (i.e. url scheme).
+subscrParsers = {
+    "vmess":  parseVmessSubscr,
+    "vless":  parseVlessSubscr,
+    "trojan": parseVlessSubscr,
+}
+
+
+def fetchV2rayNSubscrs(urls, userAgent, subscrCache=None):
     """
-    Get the content of a v2rayN subscribe link.
+    Get the content of v2rayN subscribe links. The links are fetched
+    concurrently.
+    @urls: array of <string>
     @userAgent: if not empty, override the default user agent.
-    @return: array of (type<string>, desc<string>, config<dict>)
+    @subscrCache: if not None, a <dict> of url -> {"etag", "lastModified",
+        "content"}. It's used to send conditional requests, and the cached
+        content is reused if the server replies 304 Not Modified. It's
+        updated with the new responses.
+    @return: array of <bytes>, in the same order as @urls
     """
-    numSkipped = 0
-
-    # Get the content of subscription link
-    logger.debug("Getting the content of v2rayN subscription link %s...", url)
-    request = urllib.request.Request(url)
-    if userAgent:
-        request.add_header("User-Agent", userAgent)
-    with urllib.request.urlopen(request, timeout=20) as response:
-        encBytes = response.read()
-    decBytes = base64.b64decode(encBytes)
+    def fetch(url):
+        cached = {}
+        if subscrCache is not None:
+            cached = subscrCache.get(url) or {}
+        logger.debug("Getting the content of v2rayN subscription link %s...",
+                     url)
+        content, etag, lastModified = fetchUrl(
+            url, userAgent, cached.get("etag", ""),
+            cached.get("lastModified", ""))
+        if content is None:
+            logger.debug("Not modified, using cached content: %s", url)
+            return cached["content"].encode("latin-1")
+        if subscrCache is not None and (etag or lastModified):
+            subscrCache[url] = {
+                "etag": etag,
+                "lastModified": lastModified,
+                "content": content.decode("latin-1"),
+            }
+        return content
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        return list(executor.map(fetch, urls))
+
+
+def parseV2rayNSubscr(encBytes):
+    """
+    Parse the content of a v2rayN subscribe link.
+    @encBytes: the content fetched by fetchV2rayNSubscrs() <bytes>
+    @return: generator of (type<string>, desc<string>, config<dict>).
+        The nodes are parsed one by one as the generator is consumed.
+        For a skipped line, desc is the line itself and config is None.
+    """
+    decBytes = b64decode(encBytes)
     decText = decBytes.decode("utf-8")
     lines = decText.splitlines()
     lines = filter(None, lines)   # Remove empty lines
 
     # Parse each line of the subscription
-    ret = []
     for line in lines:
         logger.debug("v2rayN subscription line: %s", line)
         urlParseRes = urllib.parse.urlparse(line)
-        logger.debug("URL parse result: %s", repr(urlParseRes))
+        logger.debug("URL parse result: %r", urlParseRes)
         nodeType = urlParseRes.scheme
         nodeConfig = None
+        subscrParser = subscrParsers.get(nodeType)
         try:
-            if nodeType == "vmess":
-                nodeConfig = parseVmessSubscr(urlParseRes)
-            elif nodeType == "vless" or nodeType == "trojan":
-                nodeConfig = parseVlessSubscr(urlParseRes)
+            if subscrParser:
+                nodeConfig = subscrParser(urlParseRes)
         except Exception as e:
             btStr = traceback.format_exc()
             logger.warning("Exception while parsing URL: %s\n%s",
-                           str(e), btStr)
+                           e, btStr)
 
         if nodeConfig is None:
             logger.warning("Skipped: %s", line)
-            numSkipped += 1
+            yield (nodeType, line, None)
             continue
 
-        desc = "<unknown>"
         if nodeType == "vmess":
             desc = nodeConfig["ps"]
-        elif nodeType == "vless" or nodeType == "trojan":
+        else:
             desc = urllib.parse.unquote(urlParseRes.fragment)
 
-        ret.append((nodeType, desc, nodeConfig))
-
-    return ret, numSkipped
+        yield (nodeType, desc, nodeConfig)
 
 
 def genVmessStreamSettings(nodeConfig):
@@ -232,120 +387,208 @@ def genVlessStreamSettings(nodeConfig):
     return ret;
 
 
-def nodeConfigToV2rayConfig(nodeType, nodeConfig):
+def genVmessOutbound(nodeConfig):
     """
-    @nodeType: <string>
+    Generate the outbound object for a VMESS node.
     @nodeConfig: <dict>
     @return: <dict> or None
     """
-    ret = {}
-
-    if nodeType == "vmess":
-        streamSettings = genVmessStreamSettings(nodeConfig)
-        if not streamSettings:
-            return None
-        ret["outbounds"] = [
-            {
-                "protocol": "vmess",
-                "settings": {
-                    "vnext": [
-                        {
-                            "address": nodeConfig["add"],
-                            "port": int(nodeConfig["port"]),
-                            "users": [
-                                {
-                                    "id": nodeConfig["id"],
-                                    "alterId": int(nodeConfig["aid"]),
-                                },
-                            ],
-                        }
-                    ],
-                },
-                "streamSettings": streamSettings,
-            },
-        ]
-    elif nodeType == "vless":
-        streamSettings = genVlessStreamSettings(nodeConfig)
-        if not streamSettings:
-            return None
-        ret["outbounds"] = [
-            {
-                "protocol": "vless",
-                "settings": {
-                    "vnext": [
+    streamSettings = genVmessStreamSettings(nodeConfig)
+    if not streamSettings:
+        return None
+    return {
+        "protocol": "vmess",
+        "settings": {
+            "vnext": [
+                {
+                    "address": nodeConfig["add"],
+                    "port": int(nodeConfig["port"]),
+                    "users": [
                         {
-                            "address": nodeConfig["n_host"],
-                            "port": int(nodeConfig["n_port"]),
-                            "users": [
-                                {
-                                    "id": nodeConfig["n_uuid"],
-                                    "encryption": nodeConfig["q_encryption"],
-                                    "flow": nodeConfig["q_flow"],
-                                },
-                            ],
-                        }
+                            "id": nodeConfig["id"],
+                            "alterId": int(nodeConfig["aid"]),
+                        },
                     ],
-                },
-                "streamSettings": streamSettings,
-            },
-        ]
-    elif nodeType == "trojan":
-        streamSettings = genVlessStreamSettings(nodeConfig)
-        if not streamSettings:
-            return None
-        ret["outbounds"] = [
-            {
-                "protocol": "trojan",
-                "settings": {
-                    "servers": [
+                }
+            ],
+        },
+        "streamSettings": streamSettings,
+    }
+
+
+def genVlessOutbound(nodeConfig):
+    """
+    Generate the outbound object for a VLESS node.
+    @nodeConfig: <dict>
+    @return: <dict> or None
+    """
+    streamSettings = genVlessStreamSettings(nodeConfig)
+    if not streamSettings:
+        return None
+    return {
+        "protocol": "vless",
+        "settings": {
+            "vnext": [
+                {
+                    "address": nodeConfig["n_host"],
+                    "port": int(nodeConfig["n_port"]),
+                    "users": [
                         {
-                            "address": nodeConfig["n_host"],
-                            "port": int(nodeConfig["n_port"]),
-                            "password": nodeConfig["n_uuid"],
+                            "id": nodeConfig["n_uuid"],
+                            "encryption": nodeConfig["q_encryption"],
                             "flow": nodeConfig["q_flow"],
-                        }
+                        },
                     ],
-                },
-                "streamSettings": streamSettings,
-            },
-        ]
-    else:
+                }
+            ],
+        },
+        "streamSettings": streamSettings,
+    }
+
+
+def genTrojanOutbound(nodeConfig):
+    """
+    Generate the outbound object for a trojan node.
+    @nodeConfig: <dict>, same format as VLESS
+    @return: <dict> or None
+    """
+    streamSettings = genVlessStreamSettings(nodeConfig)
+    if not streamSettings:
+        return None
+    return {
+        "protocol": "trojan",
+        "settings": {
+            "servers": [
+                {
+                    "address": nodeConfig["n_host"],
+                    "port": int(nodeConfig["n_port"]),
+                    "password": nodeConfig["n_uuid"],
+                    "flow": nodeConfig["q_flow"],
+                }
+            ],
+        },
+        "streamSettings": streamSettings,
+    }
+
+
+# Outbound generator for each nodeType.
+outboundGenerators = {
+    "vmess":  genVmessOutbound,
+    "vless":  genVlessOutbound,
+    "trojan": genTrojanOutbound,
+}
+
+
+def nodeConfigToV2rayConfig(nodeType, nodeConfig):
+    """
+    @nodeType: <string>
+    @nodeConfig: <dict>
+    @return: <dict> or None
+    """
+    outboundGenerator = outboundGenerators.get(nodeType)
+    if not outboundGenerator:
         logger.warning("Unsupported nodeType=%s", nodeType)
         return None
 
-    return ret
+    outbound = outboundGenerator(nodeConfig)
+    if not outbound:
+        return None
+    return {"outbounds": [outbound]}
 
 
-def writeJsonFile(path, content, dryRun=False):
+def loadCache(path):
+    """
+    Load the cache file written by saveCache(). A missing or broken cache
+    file results in an empty cache.
+    @path: cache file path
+    @return: <dict>
+    """
+    cache = {}
+    try:
+        with open(path, "rb") as cacheFile:
+            cache = jsonLoads(cacheFile.read())
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning("Ignoring broken cache file %s: %s", path, e)
+    if not isinstance(cache, dict):
+        cache = {}
+    cache.setdefault("files", {})
+    cache.setdefault("subscrs", {})
+    return cache
+
+
+def saveCache(path, cache):
+    """
+    Save the cache into a file.
+    @path: cache file path
+    @cache: <dict>
+    """
+    with open(path, "wb") as cacheFile:
+        cacheFile.write(jsonDumps(cache))
+
+
+def writeJsonFile(path, content, dryRun=False, fileCache=None):
     """
     Write JSON string into a file. If the file already exists, check its
     content, only update it when the original content is different from
     current content.
     @path: JSON file path
     @content: JSON content <dict>
+    @fileCache: if not None, a <dict> of file name -> [mtime_ns, size,
+        sha256 of content]. When the file on disk still matches its entry
+        and the content hash is the same, the file is not read at all. The
+        entry is updated after the file is checked or written.
     @return: whether the file is updated or not <bool>
     """
     dryRunPrefix = ""
     if dryRun:
         dryRunPrefix = "(dryrun) "
 
-    # Get original config file content, if any.
-    outCfgContentOrig = ""
-    if os.path.exists(path):
-        with open(path, "r") as outCfgFile:
-            outCfgContentOrig = outCfgFile.read()
+    outCfgContent = jsonDumps(content)
+    outCfgName = os.path.basename(path)
+    outCfgDigest = None
+
+    # Check the cache, skip reading the file if it's not changed since the
+    # last time it's checked or written.
+    if fileCache is not None:
+        outCfgDigest = hashlib.sha256(outCfgContent).hexdigest()
+        cached = fileCache.get(outCfgName)
+        if cached and cached[2] == outCfgDigest:
+            try:
+                st = os.stat(path)
+                if [st.st_mtime_ns, st.st_size] == cached[:2]:
+                    logger.debug("Already up-to-date (cached): outCfgPath=%s",
+                                 path)
+                    return False
+            except FileNotFoundError:
+                pass
+
+    # Compare with the original config file, if any. Its content is only
+    # read when the size is the same.
+    try:
+        with open(path, "rb") as outCfgFile:
+            st = os.fstat(outCfgFile.fileno())
+            if st.st_size != len(outCfgContent):
+                updated = True
+            else:
+                updated = outCfgFile.read() != outCfgContent
+    except FileNotFoundError:
+        updated = True
 
     # Write to config file if needed.
-    outCfgContent = json.dumps(content, indent=4)
-    if outCfgContent != outCfgContentOrig:
+    if updated:
         if not dryRun:
-            with open(path, "w") as outCfgFile:
+            with open(path, "wb") as outCfgFile:
                 outCfgFile.write(outCfgContent)
         logger.info("%sUpdated: outCfgPath=%s", dryRunPrefix, path)
-        return True
     else:
         logger.debug("Already up-to-date: outCfgPath=%s", path)
-        return False
+
+    if fileCache is not None and not (updated and dryRun):
+        st = os.stat(path)
+        fileCache[outCfgName] = [st.st_mtime_ns, st.st_size, outCfgDigest]
+    return updated
 
 
 def overrideServerWithTlsName(v2rayConfig):
@@ -354,8 +597,9 @@ def overrideServerWithTlsName(v2rayConfig):
     some connection issues.
     @v2rayConfig: result of v2rayConfig <dict>
     @return: <dict> if overridden, or None if TLS name doesn't exist.
-        The returned dict is a copy of @v2rayConfig, which means the
-        original dict won't be modified.
+        Only the objects on the path to the address are copied, the
+        rest is shared with @v2rayConfig. The original dict won't be
+        modified.
     """
     ret = None
     streamSettings = v2rayConfig["outbounds"][0]["streamSettings"]
@@ -366,21 +610,28 @@ def overrideServerWithTlsName(v2rayConfig):
         tlsName = streamSettings["xtlsSettings"]["serverName"]
 
     if tlsName:
-        ret = copy.deepcopy(v2rayConfig)
-        if "vnext" in ret["outbounds"][0]["settings"]:
-            ret["outbounds"][0]["settings"]["vnext"][0]["address"] = tlsName
-        elif "servers" in ret["outbounds"][0]["settings"]:
-            ret["outbounds"][0]["settings"]["servers"][0]["address"] = tlsName
+        outbounds = v2rayConfig["outbounds"]
+        settings = outbounds[0]["settings"]
+        if "vnext" in settings:
+            serversKey = "vnext"
+        elif "servers" in settings:
+            serversKey = "servers"
         else:
             return None
+        servers = settings[serversKey]
+        newServer = {**servers[0], "address": tlsName}
+        newSettings = {**settings, serversKey: [newServer] + servers[1:]}
+        newOutbound = {**outbounds[0], "settings": newSettings}
+        ret = {**v2rayConfig, "outbounds": [newOutbound] + outbounds[1:]}
 
     return ret
 
 
-def main(url, outDir, userAgent="", tlsNameAsServer=False, dryRun=False):
+def main(urls, outDir, userAgent="", tlsNameAsServer=False, dryRun=False):
     """
-    Fetch url, generate json config files, remove unused config files.
-    @url: <string>
+    Fetch urls, generate json config files, remove unused config files.
+    @urls: array of <string>. The nodes of all the subscriptions are
+        numbered in this order.
     @outDir: <string>
     @userAgent: the user agent string used to send HTTP requests
     @tlsNameAsServer: Generate a copy of the original config, where the
@@ -391,26 +642,42 @@ def main(url, outDir, userAgent="", tlsNameAsServer=False, dryRun=False):
     # Create output directory
     os.makedirs(outDir, exist_ok=True)
 
-    # Fetch url.
-    parseResults, numSkippedParse = parseV2rayNSubscr(url, userAgent)
+    # Load the cache of the generated config files.
+    cachePath = os.path.join(outDir, cacheFileName)
+    cache = loadCache(cachePath)
+    fileCache = cache["files"]
+    subscrCache = cache["subscrs"]
+
+    # Fetch urls. The nodes are parsed lazily while generating the configs.
+    encBodies = fetchV2rayNSubscrs(urls, userAgent, subscrCache)
+    parseResults = itertools.chain.from_iterable(
+        parseV2rayNSubscr(encBytes) for encBytes in encBodies)
     dryRunPrefix = ""
     if dryRun:
         dryRunPrefix = "(dryrun) "
 
     # Some stats.
-    numSkipped   = numSkippedParse
+    numSkipped   = 0
     numUpdated   = 0
     numAlready   = 0
     numDeleted   = 0
     usedCfgNames = set()
 
-    # For each node, generate json config file(s).
+    # For each node, generate json config(s). The file names depend on the
+    # order of the nodes, so this is done sequentially.
+    outCfgs = []    # [(outCfgPath, v2rayConfig), ...]
+    outCfgPrefix = os.path.join(outDir, "")     # outDir with trailing "/"
     idx = 0
     for res in parseResults:
         nodeType    = res[0]
         nodeDesc    = res[1]
         nodeConfig  = res[2]
 
+        # Skipped by parseV2rayNSubscr(), already logged.
+        if nodeConfig is None:
+            numSkipped += 1
+            continue
+
         # Generate v2ray config dict.
         v2rayConfig = nodeConfigToV2rayConfig(nodeType, nodeConfig)
         if not v2rayConfig:
@@ -422,17 +689,11 @@ def main(url, outDir, userAgent="", tlsNameAsServer=False, dryRun=False):
         # Construct output config file name.
         outCfgName  = "%03d-%s.json" % (idx, strToFileName(nodeDesc))
         idx += 1
-        outCfgPath  = os.path.join(outDir, outCfgName)
+        outCfgPath  = outCfgPrefix + outCfgName
         usedCfgNames.add(outCfgName)
         logger.debug("nodeType=%s, nodeDesc=%s, outCfgPath=%s",
                      nodeType, nodeDesc, outCfgPath)
-
-        # Write to the output config file.
-        updated = writeJsonFile(outCfgPath, v2rayConfig, dryRun)
-        if updated:
-            numUpdated += 1
-        else:
-            numAlready += 1
+        outCfgs.append((outCfgPath, v2rayConfig))
 
         # Generate a copy of the original config file, with server address
         # overridden by the TLS serverName.
@@ -441,25 +702,44 @@ def main(url, outDir, userAgent="", tlsNameAsServer=False, dryRun=False):
             if newV2rayConfig:
                 outCfgName  = "%03d-%s-tlsServ.json" % (idx, strToFileName(nodeDesc))
                 idx += 1
-                outCfgPath  = os.path.join(outDir, outCfgName)
+                outCfgPath  = outCfgPrefix + outCfgName
                 usedCfgNames.add(outCfgName)
                 logger.debug("nodeType=%s, nodeDesc=%s, outCfgPath=%s",
                              nodeType, nodeDesc, outCfgPath)
-                updated = writeJsonFile(outCfgPath, newV2rayConfig, dryRun)
-                if updated:
-                    numUpdated += 1
-                else:
-                    numAlready += 1
+                outCfgs.append((outCfgPath, newV2rayConfig))
+
+    # Write to the output config files. This is mostly file I/O, which
+    # releases the GIL, so the files are processed concurrently.
+    def writeOutCfg(outCfg):
+        return writeJsonFile(outCfg[0], outCfg[1], dryRun, fileCache)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        for updated in executor.map(writeOutCfg, outCfgs):
+            if updated:
+                numUpdated += 1
+            else:
+                numAlready += 1
 
     # Delete config files not used by the subscription
-    cfgNameRe = re.compile(r"^\d\d\d-.*\.json$")
-    for fileName in os.listdir(outDir):
-        if fileName not in usedCfgNames and cfgNameRe.match(fileName):
+    with os.scandir(outDir) as dirEntries:
+        for entry in dirEntries:
+            if entry.name in usedCfgNames or not isCfgFileName(entry.name):
+                continue
+            if not entry.is_file():
+                continue
             if not dryRun:
-                os.remove(os.path.join(outDir, fileName))
+                os.remove(entry.path)
             numDeleted += 1
             logger.info("%sDeleted: outCfgPath=%s",
-                        dryRunPrefix, outCfgPath)
+                        dryRunPrefix, entry.path)
+
+    # Save the cache, only for the config files and urls still in use.
+    if not dryRun:
+        cache["files"] = {k: v for k, v in fileCache.items()
+                          if k in usedCfgNames}
+        cache["subscrs"] = {k: v for k, v in subscrCache.items()
+                            if k in urls}
+        saveCache(cachePath, cache)
 
     logger.info("Summary: %snumUpdated=%d, %snumDeleted=%d, numAlready=%d, "
                 "numSkipped=%d",
@@ -472,7 +752,7 @@ def main(url, outDir, userAgent="", tlsNameAsServer=False, dryRun=False):
 if __name__ == "__main__":
     # Parse arguments
     parser = argparse.ArgumentParser(
-        description="Parse a v2rayN subscription link and generate json "
+        description="Parse v2rayN subscription link(s) and generate json "
                     "config files for v2ray into a directory. The unused "
                     "json files in that directory will be removed.")
     parser.add_argument("-v", "--verbose", action="store_true",
@@ -488,8 +768,9 @@ if __name__ == "__main__":
                              "the server address is overridden by the TLS "
                              "serverName. This may fix some connection issues. "
                              "The copy will have '-tlsServ.json' suffix.")
-    parser.add_argument("url", type=str,
-                        help="v2rayN subsription link")
+    parser.add_argument("urls", type=str, nargs="+", metavar="url",
+                        help="v2rayN subsription link(s). Multiple links "
+                             "are fetched concurrently")
     args = parser.parse_args()
 
     # Initialize logger
@@ -502,10 +783,10 @@ if __name__ == "__main__":
     logHandler.setFormatter(logFormatter)
     logger.addHandler(logHandler)
 
-    logger.debug("args=%s", repr(args))
+    logger.debug("args=%r", args)
 
     # Run main function
-    rc = main(args.url, args.output, args.agent, args.tlsNameAsServer,
+    rc = main(args.urls, args.output, args.agent, args.tlsNameAsServer,
               args.dryrun)
     sys.exit(rc)
 
@@ -56,7 +56,7 @@ TEMPLATE="$(realpath -- "$TEMPLATE")"
 
 # Fetch subscription
 [ -n "$UPDATE" ] && "$SCRIPTDIR"/v2ray-subscr.py -a "$USERAGENT" -o "$CFGDIR" \
-    ${VERBOSE:+-v} ${TLSNAMEASSERVER:+--tlsNameAsServer} "$URL"
+    ${VERBOSE:+-v} ${TLSNAMEASSERVER:+--tlsNameAsServer} "${URL[@]}"
 
 # Get the list of json config files
 CFGLIST="$(find "$CFGDIR"/ -maxdepth 1 -name '[0-9][0-9][0-9]-*.json' | sort)"